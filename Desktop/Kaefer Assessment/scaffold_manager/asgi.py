@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'scaffold_manager.settings')
 
 application = get_asgi_application()
+
+if settings.WARM_UP_ON_BOOT:
+    from scaffold_manager.warmup import warm_up
+    warm_up()
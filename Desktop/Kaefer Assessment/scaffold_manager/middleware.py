@@ -0,0 +1,38 @@
+import json
+import logging
+
+from django.db import connection
+from django.http import HttpResponse
+
+HEALTHZ_PATH = '/healthz'
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckMiddleware:
+    """
+    Answer ``/healthz`` before the rest of the middleware stack runs.
+
+    Sits first in MIDDLEWARE, so App Service probes skip host validation, SSL
+    redirects, sessions, CSRF and auth entirely. ``/healthz?db=1`` also checks
+    that the database answers, for use as a readiness probe.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path_info != HEALTHZ_PATH:
+            return self.get_response(request)
+
+        status, body = 200, {'status': 'ok'}
+        if request.GET.get('db') == '1':
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                body['database'] = 'ok'
+            except Exception:
+                # The probe is unauthenticated, so connection details only go to the log
+                logger.exception('Health check could not reach the database')
+                status, body = 503, {'status': 'error', 'database': 'unavailable'}
+        return HttpResponse(json.dumps(body), status=status, content_type='application/json')
@@ -43,7 +43,18 @@ INSTALLED_APPS = [
 
 AUTO_PROD_ON_AZURE = True # Flag for Azure auto-production switch
 
+# SCRAP archiving (see `python manage.py archive_scrap`)
+SCRAP_ARCHIVE_AFTER_DAYS = int(os.environ.get('SCRAP_ARCHIVE_AFTER_DAYS', '180'))
+SCRAP_ARCHIVE_BATCH_SIZE = int(os.environ.get('SCRAP_ARCHIVE_BATCH_SIZE', '500'))
+
+# Resolve URLs, compile templates and open the DB connection when a worker boots (see warmup.py)
+WARM_UP_ON_BOOT = os.environ.get('WARM_UP_ON_BOOT', '1') == '1'
+
+# Stock report cache lifetime in seconds; saves and deletes invalidate it early
+STOCK_REPORT_CACHE_TIMEOUT = int(os.environ.get('STOCK_REPORT_CACHE_TIMEOUT', '300'))
+
 MIDDLEWARE = [
+    'scaffold_manager.middleware.HealthCheckMiddleware', # Answers /healthz before any other middleware runs
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -124,6 +135,3 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-print(f"DEBUG: BASE_DIR = {BASE_DIR}")
-print(f"DEBUG: TEMPLATES DIRS = {[str(BASE_DIR / 'templates')]}")
\ No newline at end of file
@@ -15,6 +15,19 @@ if SECRET_KEY == 'a-very-secret-key-for-production-fallback':
     import warnings
     warnings.warn("SECRET_KEY not set in environment variable. Using a fallback value. This is insecure for production!", RuntimeWarning)
 
+# Keep DB connections open between requests so the one opened at worker boot is reused
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('CONN_MAX_AGE', '60'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Shared by every App Service worker so a save in one worker invalidates cached
+# stock reports in all of them. Create the table once with `python manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
 # Use secure cookies in production
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
@@ -0,0 +1,59 @@
+"""
+Work done once per worker at boot instead of on its first request.
+
+Called from wsgi.py/asgi.py when ``WARM_UP_ON_BOOT`` is set.
+"""
+import logging
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.template import engines
+from django.template.loader import get_template
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _project_template_names():
+    """Template names under BASE_DIR only, so admin and other third-party templates stay lazy."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(d) for engine in engines.all() for d in engine.dirs]
+    dirs += [Path(d) for d in get_app_template_dirs('templates')]
+    for template_dir in dirs:
+        template_dir = template_dir.resolve()
+        if base_dir not in template_dir.parents:
+            continue
+        for path in template_dir.rglob('*.html'):
+            yield path.relative_to(template_dir).as_posix()
+
+
+def warm_up():
+    """Populate the URL resolver, compile project templates and open the DB connection."""
+    timings = {}
+
+    start = perf_counter()
+    get_resolver().reverse_dict # Imports every view module and builds the lookup tables
+    timings['urls'] = perf_counter() - start
+
+    start = perf_counter()
+    for name in _project_template_names():
+        try:
+            get_template(name) # Stored by the cached template loader
+        except Exception:
+            logger.exception('Could not pre-compile template %s', name)
+    timings['templates'] = perf_counter() - start
+
+    # SQLite connects lazily for free, so only network databases are worth opening early
+    start = perf_counter()
+    if connection.vendor != 'sqlite':
+        try:
+            connection.ensure_connection()
+        except Exception:
+            logger.exception('Could not open database connection during warm-up')
+    timings['database'] = perf_counter() - start
+
+    logger.info('Warm-up finished: %s', ', '.join(f'{k}={v * 1000:.1f}ms' for k, v in timings.items()))
+    return timings
@@ -0,0 +1,99 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from .locations import adjust_subtree_counts
+from .models import ScaffoldComponent, ArchivedScaffoldComponent
+from .reports import invalidate_stock_report
+from .signals import bulk_write
+
+# Columns copied verbatim from the live row into the archive row
+ARCHIVED_FIELDS = [
+    'asset_code', 'name', 'category', 'length_mm', 'weight_kg', 'condition', 'site',
+    'location', 'location_node_id', 'last_inspection', 'next_inspection', 'is_in_use',
+    'created_at', 'updated_at',
+]
+
+# Columns shared by both tables when listing them together
+LISTED_FIELDS = [
+    'pk', 'asset_code', 'name', 'category', 'length_mm', 'weight_kg', 'condition', 'site',
+    'location', 'last_inspection', 'next_inspection', 'is_in_use',
+]
+
+
+def archive_candidates(older_than_days=None):
+    """SCRAP components last touched more than ``older_than_days`` ago."""
+    if older_than_days is None:
+        older_than_days = settings.SCRAP_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return ScaffoldComponent.objects.filter(condition='SCRAP', updated_at__lt=cutoff).order_by('pk')
+
+
+def archive_scrapped_components(older_than_days=None, batch_size=None):
+    """
+    Move old SCRAP components into the archive table and return how many moved.
+
+    Each batch is copied and deleted in its own transaction, walking the
+    candidates in primary key order, so an interrupted run can simply be
+    started again and picks up whatever is still left in the live table.
+    The per-row post_delete handlers are switched off with bulk_write(), so
+    location counts and the report cache are updated once per batch instead.
+    """
+    if batch_size is None:
+        batch_size = settings.SCRAP_ARCHIVE_BATCH_SIZE
+    candidates = archive_candidates(older_than_days)
+    archived = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                candidates.filter(pk__gt=last_pk)
+                .select_for_update()
+                .values('pk', *ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            pks = [row.pop('pk') for row in rows]
+            ArchivedScaffoldComponent.objects.bulk_create([
+                ArchivedScaffoldComponent(original_id=pk, **row) for pk, row in zip(pks, rows)
+            ])
+            # One LocationCount decrement per (node, condition) instead of post_delete per row
+            removed = Counter((row['location_node_id'], row['condition']) for row in rows)
+            for (location_id, condition), count in removed.items():
+                if location_id is not None:
+                    adjust_subtree_counts(location_id, condition, -count)
+            with bulk_write():
+                ScaffoldComponent.objects.filter(pk__in=pks).delete()
+            transaction.on_commit(invalidate_stock_report)
+        archived += len(pks)
+        last_pk = pks[-1]
+    return archived
+
+
+def with_archived(live_components, archived_components):
+    """
+    Union the live and archived querysets into one list of dicts.
+
+    Each row carries an ``is_archived`` flag so templates can tell them apart.
+    Both querysets should already have the same filters applied.
+    """
+    live = live_components.order_by().annotate(
+        is_archived=Value(False, output_field=BooleanField())
+    ).values(*LISTED_FIELDS, 'is_archived')
+    archived = archived_components.order_by().annotate(
+        is_archived=Value(True, output_field=BooleanField())
+    ).values(*LISTED_FIELDS, 'is_archived')
+    return live.union(archived, all=True).order_by('condition', 'name')
+
+
+def merge_counts(*count_lists, key):
+    """Add up ``values(key).annotate(count=...)`` results from several tables."""
+    totals = {}
+    for counts in count_lists:
+        for row in counts:
+            totals[row[key]] = totals.get(row[key], 0) + row['count']
+    return [{key: value, 'count': totals[value]} for value in sorted(totals)]
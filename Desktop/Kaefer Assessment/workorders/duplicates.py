@@ -0,0 +1,149 @@
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Length, Reverse
+
+from .models import ScaffoldComponent, normalize_asset_code
+
+MEMBER_FIELDS = ['pk', 'asset_code', 'asset_key', 'site', 'name']
+
+# A single edit can change the first BLOCK_CHARS characters or the last ones, but not
+# both, once the shorter key has more than SHORT_KEY_LENGTH characters
+BLOCK_CHARS = 2
+SHORT_KEY_LENGTH = 4
+
+
+def _deletion_variants(key):
+    yield key
+    for i in range(len(key)):
+        yield key[:i] + key[i + 1:]
+
+
+def _within_one_edit(a, b):
+    """True when a and b differ by one insertion, deletion, substitution or adjacent swap."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diffs) == 1 or (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+        )
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _members_by_key(keys):
+    members = {}
+    for row in ScaffoldComponent.objects.filter(asset_key__in=keys).order_by('asset_key', 'site').values(*MEMBER_FIELDS):
+        members.setdefault(row['asset_key'], []).append(row)
+    return members
+
+
+def refresh_asset_keys(batch_size=1000):
+    """
+    Recompute asset_key from asset_code wherever it is empty or out of date.
+
+    bulk_create and queryset update() bypass save(), so their rows keep the key
+    they were written with. Works through components in primary key order in
+    committed batches and returns the number of keys corrected.
+    """
+    refreshed = 0
+    last_pk = 0
+    components = ScaffoldComponent.objects.order_by('pk').only('pk', 'asset_code', 'asset_key')
+    while True:
+        with transaction.atomic():
+            batch = list(components.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            stale = []
+            for component in batch:
+                key = normalize_asset_code(component.asset_code)
+                if component.asset_key != key:
+                    component.asset_key = key
+                    stale.append(component)
+            ScaffoldComponent.objects.bulk_update(stale, ['asset_key'])
+        refreshed += len(stale)
+        last_pk = batch[-1].pk
+    return refreshed
+
+
+def find_exact_collisions():
+    """
+    Groups of components that share a canonical asset key.
+
+    Covers the same tag registered at more than one site as well as formatting
+    variants such as TB-0012 and TB0012. The grouping is a single query on the
+    indexed ``asset_key`` column; members are then fetched for the hits only.
+    """
+    keys = list(
+        ScaffoldComponent.objects.exclude(asset_key='') # Codes with no letters or digits aren't comparable
+        .order_by()
+        .values('asset_key')
+        .annotate(count=Count('id'), sites=Count('site', distinct=True))
+        .filter(count__gt=1)
+        .order_by('asset_key')
+    )
+    members = _members_by_key([row['asset_key'] for row in keys])
+    return [dict(row, components=members[row['asset_key']]) for row in keys]
+
+
+def _distinct_keys(queryset, ordering):
+    return (
+        queryset.exclude(asset_key='')
+        .order_by(ordering)
+        .values_list('asset_key', flat=True)
+        .distinct()
+        .iterator(chunk_size=5000)
+    )
+
+
+def _pairs_in_block(keys, pairs):
+    # Keys one edit apart always share a single-deletion variant (or one is the other's)
+    variants = {}
+    for key in keys:
+        for variant in set(_deletion_variants(key)):
+            for other in variants.get(variant, ()):
+                if _within_one_edit(other, key):
+                    pairs.add(tuple(sorted((other, key))))
+            variants.setdefault(variant, []).append(key)
+
+
+def find_near_duplicates():
+    """
+    Pairs of distinct canonical keys that are one edit apart (e.g. TB0012 vs TBO012).
+
+    Keys are streamed from the database three times: ordered by key and blocked
+    on their first two characters, ordered by reversed key and blocked on their
+    last two, and keys of up to four characters as one block. Every one-edit
+    pair lands together in at least one of those blocks, and only one block is
+    held in memory at a time. Within a block, only keys that share a
+    single-deletion variant are compared, never every key with every other.
+    """
+    components = ScaffoldComponent.objects.all()
+    passes = [
+        (_distinct_keys(components, 'asset_key'), lambda key: key[:BLOCK_CHARS]),
+        (_distinct_keys(components, Reverse('asset_key')), lambda key: key[-BLOCK_CHARS:]),
+        (
+            _distinct_keys(
+                components.annotate(key_length=Length('asset_key')).filter(key_length__lte=SHORT_KEY_LENGTH),
+                'asset_key',
+            ),
+            lambda key: None,
+        ),
+    ]
+    pairs = set()
+    for keys, block_key in passes:
+        for _, block in groupby(keys, key=block_key):
+            _pairs_in_block(block, pairs)
+
+    members = _members_by_key({key for pair in pairs for key in pair})
+    return [
+        {'asset_key': a, 'similar_key': b, 'components': members[a] + members[b]}
+        for a, b in sorted(pairs)
+    ]
@@ -3,6 +3,12 @@ from .models import ScaffoldComponent
 from django.core.exceptions import ValidationError
 
 class ScaffoldComponentForm(forms.ModelForm):
+    # Version the user started editing from; checked by save_with_version()
+    version = forms.IntegerField(
+        widget=forms.HiddenInput, required=False,
+        error_messages={'required': 'This edit is missing the version it was based on. Reload the page and try again.'},
+    )
+
     class Meta:
         model = ScaffoldComponent
         fields = '__all__'
@@ -13,6 +19,13 @@ class ScaffoldComponentForm(forms.ModelForm):
             'next_inspection': forms.DateInput(attrs={'type': 'date'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.fields['version'].initial = self.instance.version
+            # Edits must say which version they started from, or the check could never fail
+            self.fields['version'].required = True
+
     def clean_weight_kg(self):
         weight_kg = self.cleaned_data['weight_kg']
         if weight_kg <= 0:
@@ -44,3 +57,12 @@ class ScaffoldComponentForm(forms.ModelForm):
                 self.add_error('asset_code', 'An asset with this code already exists at this site.')
         
         return cleaned_data
+
+    def save_with_version(self):
+        """
+        Save only the changed fields, provided nobody else has saved the component since it was loaded.
+
+        Raises ConcurrentEditError otherwise.
+        """
+        self.instance.save_changes(self.changed_data, self.cleaned_data['version'])
+        return self.instance
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Location, LocationCount, ScaffoldComponent
+
+
+def subtree_node_ids(path):
+    """
+    Ids of a location and everything below it.
+
+    Descendants are matched with a range on the unique ``path`` index rather than
+    LIKE, which is case-insensitive and unindexed on SQLite: every path below
+    ``p`` sorts between ``p/`` and ``p0``, ``0`` being the character after ``/``.
+    """
+    upper_bound = path + chr(ord(Location.PATH_SEPARATOR) + 1)
+    return Location.objects.filter(
+        Q(path=path) | Q(path__gte=path + Location.PATH_SEPARATOR, path__lt=upper_bound)
+    ).values('pk')
+
+
+def subtree_q(path, field='location_node_id'):
+    """Match components in a location subtree through the indexed location_node foreign key."""
+    return Q(**{f'{field}__in': subtree_node_ids(path)})
+
+
+def adjust_subtree_counts(location_id, condition, delta):
+    """Add ``delta`` to the ``condition`` count of a location and all of its ancestors."""
+    node = Location.objects.only('path').get(pk=location_id)
+    LocationCount.objects.filter(
+        location__path__in=node.ancestor_paths(), condition=condition,
+    ).update(count=F('count') + delta)
+
+
+def subtree_counts(path):
+    """Condition counts for a location subtree, read straight from LocationCount."""
+    return list(
+        LocationCount.objects.filter(location__path=path)
+        .values('condition', 'count')
+        .order_by('condition')
+    )
+
+
+@transaction.atomic
+def rebuild_location_counts():
+    """Recompute every LocationCount from scratch, e.g. after bulk updates that skip signals."""
+    totals = {}
+    for row in (
+        ScaffoldComponent.objects.filter(location_node__isnull=False)
+        .order_by()
+        .values('location_node__path', 'condition')
+        .annotate(count=Count('id'))
+    ):
+        node = Location(path=row['location_node__path'])
+        for path in node.ancestor_paths():
+            key = (path, row['condition'])
+            totals[key] = totals.get(key, 0) + row['count']
+
+    counts = list(LocationCount.objects.select_related('location'))
+    for location_count in counts:
+        location_count.count = totals.get((location_count.location.path, location_count.condition), 0)
+    LocationCount.objects.bulk_update(counts, ['count'], batch_size=1000)
+
+
+def build_location_index(batch_size=1000):
+    """
+    Attach every component without a location node to one, parsed from its free text.
+
+    Works through components in primary key order in committed batches, so an
+    interrupted run can be restarted and only handles what is left. Subtree
+    counts are rebuilt at the end because bulk_update does not send signals.
+    Returns the number of components indexed.
+    """
+    nodes = {}
+    indexed = 0
+    last_pk = 0
+    pending = ScaffoldComponent.objects.filter(location_node__isnull=True).order_by('pk')
+    while True:
+        with transaction.atomic():
+            batch = list(pending.filter(pk__gt=last_pk).only('pk', 'site', 'location')[:batch_size])
+            if not batch:
+                break
+            for component in batch:
+                key = (component.site, Location.path_for(component.site, component.location))
+                if key not in nodes:
+                    nodes[key] = Location.for_text(component.site, component.location)
+                component.location_node = nodes[key]
+            ScaffoldComponent.objects.bulk_update(batch, ['location_node'])
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+    rebuild_location_counts()
+    return indexed
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workorders.archive import archive_scrapped_components
+
+
+class Command(BaseCommand):
+    help = 'Move SCRAP components older than the archive age out of the live table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.SCRAP_ARCHIVE_AFTER_DAYS,
+            help='Only archive SCRAP components not updated for this many days.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.SCRAP_ARCHIVE_BATCH_SIZE,
+            help='Number of components moved per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_scrapped_components(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} SCRAP component(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from workorders.locations import build_location_index
+
+
+class Command(BaseCommand):
+    help = 'Link components to the location hierarchy and rebuild subtree counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of components linked per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        indexed = build_location_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} component(s).'))
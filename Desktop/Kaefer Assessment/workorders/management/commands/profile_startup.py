@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What each target does in a fresh interpreter
+TARGETS = {
+    'wsgi': 'import scaffold_manager.wsgi',
+    'manage': (
+        'from django.core.management import execute_from_command_line; '
+        'execute_from_command_line(["manage.py", "check"])'
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = 'Show the slowest imports when starting the WSGI app or manage.py (python -X importtime).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(TARGETS), default='wsgi')
+        parser.add_argument('--top', type=int, default=20, help='Number of modules to list.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'scaffold_manager.settings'))
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', TARGETS[options['target']]],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            self.stderr.write(result.stderr)
+            return
+
+        # Lines look like "import time:       123 |       4567 |   django.urls"
+        modules = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+            modules.append((int(cumulative_us), int(self_us), name))
+        modules.sort(reverse=True)
+
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for cumulative_us, self_us, name in modules[:options['top']]:
+            self.stdout.write(f'{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['target']}: {len(modules)} modules imported, {elapsed * 1000:.0f}ms wall time"
+        ))
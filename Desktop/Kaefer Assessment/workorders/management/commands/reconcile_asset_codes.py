@@ -0,0 +1,46 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from workorders.duplicates import find_exact_collisions, find_near_duplicates, refresh_asset_keys
+
+
+class Command(BaseCommand):
+    help = 'Report asset codes that collide across sites or are one typo apart.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Write every affected component to this CSV file.')
+        parser.add_argument('--skip-near', action='store_true', help='Only look for exact canonical matches.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of components whose asset key is checked per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_asset_keys(batch_size=options['batch_size'])
+        self.stdout.write(f'Refreshed {refreshed} stale asset key(s).')
+
+        exact = find_exact_collisions()
+        near = [] if options['skip_near'] else find_near_duplicates()
+
+        for group in exact:
+            codes = ', '.join(f"{c['asset_code']}@{c['site']}" for c in group['components'])
+            self.stdout.write(f"EXACT {group['asset_key']}: {codes}")
+        for pair in near:
+            codes = ', '.join(f"{c['asset_code']}@{c['site']}" for c in pair['components'])
+            self.stdout.write(f"NEAR {pair['asset_key']} ~ {pair['similar_key']}: {codes}")
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Match', 'Key', 'Similar Key', 'ID', 'Asset Code', 'Site', 'Name'])
+                for group in exact:
+                    for c in group['components']:
+                        writer.writerow(['exact', group['asset_key'], '', c['pk'], c['asset_code'], c['site'], c['name']])
+                for pair in near:
+                    for c in pair['components']:
+                        writer.writerow(['near', pair['asset_key'], pair['similar_key'], c['pk'], c['asset_code'], c['site'], c['name']])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(exact)} exact collision group(s), {len(near)} near-duplicate pair(s).'
+        ))
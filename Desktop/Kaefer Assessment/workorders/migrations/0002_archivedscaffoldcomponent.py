@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedScaffoldComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_code', models.CharField(max_length=50)),
+                ('name', models.CharField(max_length=100)),
+                ('category', models.CharField(choices=[('Tube', 'Tube'), ('Board', 'Board'), ('Coupler', 'Coupler'), ('Jack', 'Jack'), ('Frame', 'Frame'), ('Other', 'Other')], max_length=100)),
+                ('length_mm', models.IntegerField(blank=True, null=True)),
+                ('weight_kg', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('condition', models.CharField(choices=[('NEW', 'NEW'), ('GOOD', 'GOOD'), ('REPAIR', 'REPAIR'), ('SCRAP', 'SCRAP')], default='GOOD', max_length=10)),
+                ('site', models.CharField(choices=[('Secunda', 'Secunda'), ('Sasolburg', 'Sasolburg')], max_length=100)),
+                ('location', models.CharField(blank=True, max_length=100, null=True)),
+                ('last_inspection', models.DateField(default=django.utils.timezone.now)),
+                ('next_inspection', models.DateField()),
+                ('is_in_use', models.BooleanField(default=False)),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['condition', 'name'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scaffoldcomponent',
+            index=models.Index(fields=['condition', 'updated_at'], name='workorders__conditi_93a0c6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedscaffoldcomponent',
+            index=models.Index(fields=['site', 'condition'], name='workorders__site_186ba8_idx'),
+        ),
+    ]
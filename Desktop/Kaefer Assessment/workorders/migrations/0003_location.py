@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+# Copied from the models at the time of writing so this migration never changes
+CONDITIONS = ['NEW', 'GOOD', 'REPAIR', 'SCRAP']
+BATCH_SIZE = 2000
+
+
+def link_locations(apps, schema_editor):
+    """Link existing live and archived rows to Location nodes in batches, then fill LocationCount."""
+    Location = apps.get_model('workorders', 'Location')
+    LocationCount = apps.get_model('workorders', 'LocationCount')
+    nodes = {}
+
+    def node_for(site, text):
+        segments = [segment.strip() for segment in (text or '').split('/')]
+        names = [site] + [segment for segment in segments if segment]
+        parent = None
+        for depth, name in enumerate(names):
+            path = '/'.join(names[:depth + 1])
+            if path not in nodes:
+                nodes[path], _ = Location.objects.get_or_create(
+                    path=path, defaults={'site': site, 'name': name, 'parent': parent, 'depth': depth},
+                )
+            parent = nodes[path]
+        return parent
+
+    for model_name in ['ScaffoldComponent', 'ArchivedScaffoldComponent']:
+        model = apps.get_model('workorders', model_name)
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk, location_node__isnull=True)
+                .only('pk', 'site', 'location').order_by('pk')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for row in batch:
+                row.location_node = node_for(row.site, row.location)
+            model.objects.bulk_update(batch, ['location_node'])
+            last_pk = batch[-1].pk
+
+    # Subtree counts cover live components only, added to every ancestor of their node
+    ScaffoldComponent = apps.get_model('workorders', 'ScaffoldComponent')
+    totals = {}
+    for row in (
+        ScaffoldComponent.objects.order_by()
+        .values('location_node__path', 'condition')
+        .annotate(count=Count('id'))
+    ):
+        segments = row['location_node__path'].split('/')
+        for i in range(1, len(segments) + 1):
+            key = ('/'.join(segments[:i]), row['condition'])
+            totals[key] = totals.get(key, 0) + row['count']
+    # LocationCount was created empty by this migration, so every row is new
+    LocationCount.objects.bulk_create([
+        LocationCount(location=node, condition=condition, count=totals.get((node.path, condition), 0))
+        for node in Location.objects.all().iterator()
+        for condition in CONDITIONS
+    ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0002_archivedscaffoldcomponent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(choices=[('Secunda', 'Secunda'), ('Sasolburg', 'Sasolburg')], max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='workorders.location')),
+            ],
+            options={
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedscaffoldcomponent',
+            name='location_node',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workorders.location'),
+        ),
+        migrations.AddField(
+            model_name='scaffoldcomponent',
+            name='location_node',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workorders.location'),
+        ),
+        migrations.CreateModel(
+            name='LocationCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('condition', models.CharField(choices=[('NEW', 'NEW'), ('GOOD', 'GOOD'), ('REPAIR', 'REPAIR'), ('SCRAP', 'SCRAP')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counts', to='workorders.location')),
+            ],
+            options={
+                'ordering': ['location', 'condition'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='locationcount',
+            unique_together={('location', 'condition')},
+        ),
+        migrations.RunPython(link_locations, migrations.RunPython.noop),
+    ]
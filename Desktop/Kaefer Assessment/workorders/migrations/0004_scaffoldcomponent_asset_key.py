@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:27
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_asset_key(apps, schema_editor):
+    # Same rule as workorders.models.normalize_asset_code, copied so this migration never changes
+    ScaffoldComponent = apps.get_model('workorders', 'ScaffoldComponent')
+    batch = []
+    for component in ScaffoldComponent.objects.only('pk', 'asset_code').order_by('pk').iterator(chunk_size=2000):
+        component.asset_key = re.sub(r'[^0-9A-Z]', '', component.asset_code.upper())
+        batch.append(component)
+        if len(batch) >= 2000:
+            ScaffoldComponent.objects.bulk_update(batch, ['asset_key'])
+            batch = []
+    if batch:
+        ScaffoldComponent.objects.bulk_update(batch, ['asset_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0003_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scaffoldcomponent',
+            name='asset_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill_asset_key, migrations.RunPython.noop),
+    ]
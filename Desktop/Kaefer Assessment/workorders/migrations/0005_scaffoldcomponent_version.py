@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0004_scaffoldcomponent_asset_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scaffoldcomponent',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -1,8 +1,25 @@
-from django.db import models
+import re
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
-class ScaffoldComponent(models.Model):
+
+def normalize_asset_code(asset_code):
+    """Canonical form of an asset code: upper case, letters and digits only (TB-0012 -> TB0012)."""
+    return re.sub(r'[^0-9A-Z]', '', (asset_code or '').upper())
+
+
+class ConcurrentEditError(Exception):
+    """Raised by ScaffoldComponent.save_changes when the row has moved past the expected version."""
+
+    def __init__(self, pk, expected_version):
+        super().__init__(f'ScaffoldComponent {pk} is no longer at version {expected_version}.')
+        self.pk = pk
+        self.expected_version = expected_version
+
+
+class ScaffoldComponentFields(models.Model):
+    """Columns shared by the live register and the SCRAP archive."""
     CATEGORY_CHOICES = [
         ('Tube', 'Tube'),
         ('Board', 'Board'),
@@ -32,15 +49,97 @@ class ScaffoldComponent(models.Model):
     condition = models.CharField(max_length=10, choices=CONDITION_CHOICES, default='GOOD')
     site = models.CharField(max_length=100, choices=SITE_CHOICES)
     location = models.CharField(max_length=100, blank=True, null=True)
+    # Resolved from site + location on save; see Location.for_text
+    location_node = models.ForeignKey(
+        'Location', null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name='+',
+    )
     last_inspection = models.DateField(default=timezone.now)
     next_inspection = models.DateField()
     is_in_use = models.BooleanField(default=False)
+
+    class Meta:
+        abstract = True
+
+
+class Location(models.Model):
+    """
+    A node in the site/area/bay hierarchy, stored as a materialized path.
+
+    ``path`` is the site followed by each location segment, joined with ``/``
+    (e.g. ``Secunda/Unit 12/Bay 3``), so a subtree is a single prefix lookup.
+    """
+    PATH_SEPARATOR = '/'
+
+    site = models.CharField(max_length=100, choices=ScaffoldComponentFields.SITE_CHOICES)
+    name = models.CharField(max_length=100)
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='children')
+    path = models.CharField(max_length=255, unique=True)
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['path']
+
+    @classmethod
+    def path_for(cls, site, text):
+        segments = [segment.strip() for segment in (text or '').split(cls.PATH_SEPARATOR)]
+        return cls.PATH_SEPARATOR.join([site] + [segment for segment in segments if segment])
+
+    @classmethod
+    def for_text(cls, site, text):
+        """Return the node for a free-text location at a site, creating missing levels."""
+        path = cls.path_for(site, text)
+        node = cls.objects.filter(path=path).first()
+        if node is not None:
+            return node
+        parent = None
+        for depth, name in enumerate(path.split(cls.PATH_SEPARATOR)):
+            node_path = name if parent is None else f'{parent.path}{cls.PATH_SEPARATOR}{name}'
+            node, created = cls.objects.get_or_create(
+                path=node_path, defaults={'site': site, 'name': name, 'parent': parent, 'depth': depth},
+            )
+            if created:
+                LocationCount.objects.bulk_create([
+                    LocationCount(location=node, condition=value)
+                    for value, _ in ScaffoldComponentFields.CONDITION_CHOICES
+                ])
+            parent = node
+        return node
+
+    def ancestor_paths(self):
+        """Paths of this node and every node above it."""
+        segments = self.path.split(self.PATH_SEPARATOR)
+        return [self.PATH_SEPARATOR.join(segments[:i]) for i in range(1, len(segments) + 1)]
+
+    def __str__(self):
+        return self.path
+
+
+class LocationCount(models.Model):
+    """Live components in a location's whole subtree, per condition, kept up to date on save/delete."""
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='counts')
+    condition = models.CharField(max_length=10, choices=ScaffoldComponentFields.CONDITION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('location', 'condition')
+        ordering = ['location', 'condition']
+
+    def __str__(self):
+        return f"{self.location.path} {self.condition}: {self.count}"
+
+
+class ScaffoldComponent(ScaffoldComponentFields):
+    asset_key = models.CharField(max_length=50, db_index=True, editable=False, default='')
+    version = models.PositiveIntegerField(default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('asset_code', 'site')
         ordering = ['condition', 'name'] # Default order: condition asc, then name asc
+        indexes = [
+            models.Index(fields=['condition', 'updated_at']), # Archive candidate scan
+        ]
 
     def clean(self):
         super().clean()
@@ -53,9 +152,95 @@ class ScaffoldComponent(models.Model):
         if self.last_inspection and self.next_inspection and self.next_inspection < self.last_inspection:
             raise ValidationError({'next_inspection': 'Next inspection date must be on or after the last inspection date.'})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so saves can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _refresh_derived_fields(self):
+        """Recompute columns derived from user input and return the names of those that changed."""
+        changed = []
+        asset_key = normalize_asset_code(self.asset_code)
+        if asset_key != self.asset_key:
+            self.asset_key = asset_key
+            changed.append('asset_key')
+        loaded = getattr(self, '_loaded_values', {})
+        if (self.location_node_id is None or loaded.get('site') != self.site
+                or loaded.get('location') != self.location):
+            location_node = Location.for_text(self.site, self.location)
+            if location_node.pk != self.location_node_id:
+                self.location_node = location_node
+                changed.append('location_node')
+        return changed
+
     def save(self, *args, **kwargs):
         self.full_clean() # Call full_clean to trigger model-level validation before saving
-        super().save(*args, **kwargs)
+        self._refresh_derived_fields()
+        bump_version = not self._state.adding
+        if bump_version:
+            # Unconditional saves still invalidate edits that started from the old version
+            previous_version = self.version
+            self.version = models.F('version') + 1
+        try:
+            # post_save adjusts LocationCount; the row and its counts commit or fail together
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+        except Exception:
+            if bump_version:
+                self.version = previous_version # Don't leave the F() expression behind
+            raise
+        if bump_version:
+            self.refresh_from_db(fields=['version'])
+
+    def save_changes(self, fields, expected_version):
+        """
+        Write only ``fields`` if the row is still at ``expected_version``.
+
+        Runs a single ``UPDATE ... WHERE id = ? AND version = ?`` instead of
+        locking the row, and raises ConcurrentEditError if another edit got
+        there first. Assumes the values have already been validated (e.g. by
+        ScaffoldComponentForm). Sends post_save like save() does so location
+        counts and report caches stay current.
+        """
+        fields = [f for f in fields if f != 'version'] + self._refresh_derived_fields()
+        self.updated_at = timezone.now()
+        values = {f: getattr(self, f) for f in fields}
+        with transaction.atomic(using=self._state.db):
+            updated = ScaffoldComponent.objects.filter(pk=self.pk, version=expected_version).update(
+                **values, updated_at=self.updated_at, version=models.F('version') + 1,
+            )
+            if not updated:
+                raise ConcurrentEditError(self.pk, expected_version)
+            models.signals.post_save.send(
+                sender=ScaffoldComponent, instance=self, created=False,
+                update_fields=frozenset(fields + ['updated_at', 'version']), raw=False, using=self._state.db,
+            )
+        self.version = expected_version + 1
+
+    def delete(self, *args, **kwargs):
+        # post_delete adjusts LocationCount; keep it in the same transaction as the DELETE
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.asset_code}) - {self.site}"
+
+
+class ArchivedScaffoldComponent(ScaffoldComponentFields):
+    """A SCRAP component moved out of the live table by ``archive_scrap``."""
+    original_id = models.BigIntegerField(unique=True)
+    # Copied verbatim from the live row, so no auto_now/auto_now_add here
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['condition', 'name']
+        indexes = [
+            models.Index(fields=['site', 'condition']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.asset_code}) - {self.site} [archived]"
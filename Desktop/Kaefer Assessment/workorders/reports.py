@@ -0,0 +1,147 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import ScaffoldComponent
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_VERSION_KEY = 'workorders:stock_report:version'
+LENGTH_BUCKET_MM = 500
+REPORT_SECTIONS = ('stock', 'lengths', 'conditions', 'inspections')
+
+
+def _report_version():
+    # Workers only see each other's invalidations if CACHES is shared (DatabaseCache in prod.py).
+    # A fresh version starts from the clock so it never matches reports cached before an eviction.
+    cache.add(REPORT_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+    return cache.get(REPORT_CACHE_VERSION_KEY)
+
+
+def invalidate_stock_report():
+    """Drop every cached report by moving on to a new version number."""
+    # Runs after every component write, so a broken cache must not turn saves into errors;
+    # cached reports then expire after STOCK_REPORT_CACHE_TIMEOUT instead
+    try:
+        try:
+            cache.incr(REPORT_CACHE_VERSION_KEY)
+        except ValueError:
+            cache.set(REPORT_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+    except Exception:
+        logger.exception('Could not invalidate the cached stock reports')
+
+
+def build_stock_report(site=None):
+    """
+    Weight, piece count, length, condition and inspection figures per site/location.
+
+    All grouping is done by the database in a handful of aggregate queries, so the
+    cost does not grow with the number of rows pulled into Python. Results are
+    cached until a component is saved or deleted.
+    """
+    try:
+        key = f'workorders:stock_report:{_report_version()}:{site or "all"}'
+        report = cache.get(key)
+    except Exception:
+        logger.exception('Stock report cache is unavailable, building the report uncached')
+        return _compute_stock_report(site)
+    if report is None:
+        report = _compute_stock_report(site)
+        try:
+            cache.set(key, report, timeout=settings.STOCK_REPORT_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception('Could not cache the stock report')
+    return report
+
+
+def _compute_stock_report(site=None):
+    components = ScaffoldComponent.objects.order_by() # Drop Meta.ordering so it doesn't leak into GROUP BY
+    if site:
+        components = components.filter(site=site)
+    today = timezone.now().date()
+
+    stock = list(
+        components.values('site', 'location', 'category')
+        .annotate(pieces=Count('id'), total_weight_kg=Sum('weight_kg'))
+        .order_by('site', 'location', 'category')
+    )
+
+    weight_by_site = list(
+        components.values('site')
+        .annotate(pieces=Count('id'), total_weight_kg=Sum('weight_kg'))
+        .order_by('site')
+    )
+
+    # Integer division puts each length into a LENGTH_BUCKET_MM wide bucket
+    length_histogram = []
+    for row in (
+        components.filter(length_mm__isnull=False)
+        .annotate(bucket=(F('length_mm') - 1) / LENGTH_BUCKET_MM)
+        .values('category', 'bucket')
+        .annotate(count=Count('id'))
+        .order_by('category', 'bucket')
+    ):
+        length_histogram.append({
+            'category': row['category'],
+            'min_mm': row['bucket'] * LENGTH_BUCKET_MM + 1,
+            'max_mm': (row['bucket'] + 1) * LENGTH_BUCKET_MM,
+            'count': row['count'],
+        })
+
+    condition_mix = {}
+    for row in (
+        components.values('site', 'location', 'condition')
+        .annotate(count=Count('id'))
+        .order_by('site', 'location')
+    ):
+        mix = condition_mix.setdefault((row['site'], row['location']), {
+            'site': row['site'],
+            'location': row['location'],
+            'conditions': {value: 0 for value, _ in ScaffoldComponent.CONDITION_CHOICES},
+            'total': 0,
+        })
+        mix['conditions'][row['condition']] = row['count']
+        mix['total'] += row['count']
+
+    inspections = []
+    for row in (
+        components.values('site', 'location')
+        .annotate(total=Count('id'), overdue=Count('id', filter=Q(next_inspection__lt=today)))
+        .order_by('site', 'location')
+    ):
+        row['overdue_ratio'] = row['overdue'] / row['total'] if row['total'] else 0
+        inspections.append(row)
+
+    return {
+        'generated_at': timezone.now(),
+        'stock': stock,
+        'weight_by_site': weight_by_site,
+        'length_histogram': length_histogram,
+        'condition_mix': list(condition_mix.values()),
+        'inspections': inspections,
+    }
+
+
+def report_csv_rows(report, section):
+    """Header and rows for one section of the report, for CSV export."""
+    if section == 'lengths':
+        yield ['Category', 'Min (mm)', 'Max (mm)', 'Count']
+        for row in report['length_histogram']:
+            yield [row['category'], row['min_mm'], row['max_mm'], row['count']]
+    elif section == 'conditions':
+        conditions = [value for value, _ in ScaffoldComponent.CONDITION_CHOICES]
+        yield ['Site', 'Location', *conditions, 'Total']
+        for row in report['condition_mix']:
+            yield [row['site'], row['location'] or '', *(row['conditions'][c] for c in conditions), row['total']]
+    elif section == 'inspections':
+        yield ['Site', 'Location', 'Total', 'Overdue', 'Overdue Ratio']
+        for row in report['inspections']:
+            yield [row['site'], row['location'] or '', row['total'], row['overdue'], f"{row['overdue_ratio']:.4f}"]
+    else:
+        yield ['Site', 'Location', 'Category', 'Pieces', 'Total Weight (kg)']
+        for row in report['stock']:
+            yield [row['site'], row['location'] or '', row['category'], row['pieces'], f"{row['total_weight_kg']:.2f}"]
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ScaffoldComponent
+from .locations import adjust_subtree_counts
+from .reports import invalidate_stock_report
+
+# Set while a bulk operation maintains location counts and the report cache itself
+_bulk_write = ContextVar('workorders_bulk_write', default=False)
+
+
+@contextmanager
+def bulk_write():
+    """Skip the per-row handlers below; the caller updates counts and the report cache once per batch."""
+    token = _bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_write.reset(token)
+
+
+@receiver(post_save, sender=ScaffoldComponent)
+@receiver(post_delete, sender=ScaffoldComponent)
+def scaffold_component_changed(sender, **kwargs):
+    if _bulk_write.get():
+        return
+    # Wait for the write to commit so no worker can re-cache the old figures in between
+    transaction.on_commit(invalidate_stock_report)
+
+
+@receiver(post_save, sender=ScaffoldComponent)
+def update_location_counts_on_save(sender, instance, created, **kwargs):
+    if _bulk_write.get():
+        return
+    loaded = {} if created else getattr(instance, '_loaded_values', {})
+    old = (loaded.get('location_node_id'), loaded.get('condition'))
+    new = (instance.location_node_id, instance.condition)
+    if old != new:
+        if old[0] is not None:
+            adjust_subtree_counts(old[0], old[1], -1)
+        if new[0] is not None:
+            adjust_subtree_counts(new[0], new[1], 1)
+    instance._loaded_values = {
+        **loaded,
+        'site': instance.site,
+        'location': instance.location,
+        'location_node_id': instance.location_node_id,
+        'condition': instance.condition,
+    }
+
+
+@receiver(post_delete, sender=ScaffoldComponent)
+def update_location_counts_on_delete(sender, instance, **kwargs):
+    if _bulk_write.get():
+        return
+    if instance.location_node_id is not None:
+        adjust_subtree_counts(instance.location_node_id, instance.condition, -1)
@@ -1,9 +1,35 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.utils import timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
 from datetime import timedelta
-from .models import ScaffoldComponent
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+import json
+import subprocess
+import sys
+from .models import ScaffoldComponent, ArchivedScaffoldComponent, LocationCount, ConcurrentEditError
 from .forms import ScaffoldComponentForm
+from .archive import archive_scrapped_components
+from .reports import build_stock_report
+from .locations import build_location_index, subtree_counts
+from .duplicates import find_exact_collisions, find_near_duplicates
+
+
+def make_component(asset_code, **overrides):
+    """Create a valid component, overriding only the fields a test cares about."""
+    today = timezone.now().date()
+    fields = {
+        'name': f'Tube {asset_code}', 'category': 'Tube', 'weight_kg': 10.0, 'site': 'Secunda',
+        'condition': 'GOOD', 'last_inspection': today, 'next_inspection': today + timedelta(days=30),
+    }
+    fields.update(overrides)
+    return ScaffoldComponent.objects.create(asset_code=asset_code, **fields)
+
 
 class ScaffoldComponentModelTest(TestCase):
     def setUp(self):
@@ -246,6 +272,7 @@ class ScaffoldComponentViewTest(TestCase):
             'next_inspection': self.component1.next_inspection,
             'condition': 'GOOD',
             'is_in_use': True,
+            'version': self.component1.version,
         }
         response = self.client.post(reverse('scaffold_component_edit', args=[self.component1.pk]), updated_data)
         self.assertEqual(response.status_code, 302) # Redirect on success
@@ -264,6 +291,7 @@ class ScaffoldComponentViewTest(TestCase):
             'next_inspection': self.component1.next_inspection,
             'condition': 'GOOD',
             'is_in_use': False,
+            'version': self.component1.version,
         }
         response = self.client.post(reverse('scaffold_component_edit', args=[self.component1.pk]), invalid_updated_data)
         self.assertEqual(response.status_code, 200) # Form redisplayed with errors
@@ -283,4 +311,437 @@ class ScaffoldComponentViewTest(TestCase):
         component_pk = self.component1.pk
         response = self.client.post(reverse('scaffold_component_delete', args=[component_pk]))
         self.assertEqual(response.status_code, 302) # Redirect on success
-        self.assertFalse(ScaffoldComponent.objects.filter(pk=component_pk).exists())
\ No newline at end of file
+        self.assertFalse(ScaffoldComponent.objects.filter(pk=component_pk).exists())
+
+
+class ScaffoldComponentArchiveTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        for i in range(5):
+            make_component(f'SCRAP{i:03d}', name=f'Scrap Tube {i}', condition='SCRAP')
+        self.fresh_scrap = make_component('SCRAP999', name='Fresh Scrap', condition='SCRAP')
+        self.good = make_component('GOOD001', name='Good Board', category='Board', weight_kg=8.0, site='Sasolburg')
+        # update() bypasses auto_now, so this backdates the rows
+        ScaffoldComponent.objects.exclude(pk=self.fresh_scrap.pk).update(
+            updated_at=timezone.now() - timedelta(days=400)
+        )
+
+    def test_archive_moves_only_old_scrap(self):
+        archived = archive_scrapped_components(older_than_days=365, batch_size=2)
+        self.assertEqual(archived, 5)
+        self.assertEqual(ArchivedScaffoldComponent.objects.count(), 5)
+        self.assertFalse(ScaffoldComponent.objects.filter(asset_code__startswith='SCRAP0').exists())
+        self.assertTrue(ScaffoldComponent.objects.filter(pk=self.fresh_scrap.pk).exists())
+        self.assertTrue(ScaffoldComponent.objects.filter(pk=self.good.pk).exists())
+
+    def test_archive_preserves_row_data(self):
+        original = ScaffoldComponent.objects.get(asset_code='SCRAP000')
+        archive_scrapped_components(older_than_days=365)
+        archived = ArchivedScaffoldComponent.objects.get(original_id=original.pk)
+        self.assertEqual(archived.asset_code, original.asset_code)
+        self.assertEqual(archived.weight_kg, original.weight_kg)
+        self.assertEqual(archived.created_at, original.created_at)
+        self.assertEqual(archived.updated_at, original.updated_at)
+
+    def test_archive_batch_does_not_run_per_row_queries(self):
+        for i in range(50):
+            make_component(f'BULK{i:03d}', location='Unit 12/Bay 1', condition='SCRAP')
+        ScaffoldComponent.objects.filter(condition='SCRAP').update(updated_at=timezone.now() - timedelta(days=400))
+        # Per batch: savepoints, select, insert, one decrement per (node, condition), and
+        # the collector's select plus delete; one report invalidation is queued per batch
+        with self.assertNumQueries(13), self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(archive_scrapped_components(older_than_days=365, batch_size=500), 56)
+        self.assertEqual(len(callbacks), 1)
+        counts = {row['condition']: row['count'] for row in subtree_counts('Secunda')}
+        self.assertEqual(counts['SCRAP'], 0)
+        self.assertEqual(counts['GOOD'], 0)
+
+    def test_archive_is_resumable(self):
+        self.assertEqual(archive_scrapped_components(older_than_days=365), 5)
+        self.assertEqual(archive_scrapped_components(older_than_days=365), 0)
+        self.assertEqual(ArchivedScaffoldComponent.objects.count(), 5)
+
+    def test_archive_scrap_command(self):
+        out = StringIO()
+        call_command('archive_scrap', '--older-than-days=365', '--batch-size=3', stdout=out)
+        self.assertIn('Archived 5', out.getvalue())
+
+    def test_list_view_excludes_archived_by_default(self):
+        archive_scrapped_components(older_than_days=365)
+        response = self.client.get(reverse('scaffold_component_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertNotContains(response, 'Scrap Tube 0')
+
+    def test_list_view_include_archived(self):
+        archive_scrapped_components(older_than_days=365)
+        response = self.client.get(reverse('scaffold_component_list'), {'include_archived': '1', 'condition': 'SCRAP'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, 6)
+        self.assertContains(response, 'Scrap Tube 0')
+        self.assertContains(response, 'Archived')
+        self.assertEqual(list(response.context['condition_counts']), [{'condition': 'SCRAP', 'count': 6}])
+
+
+class StockReportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        today = timezone.now().date()
+        make_component(
+            'REP001', length_mm=1500, location='Yard A',
+            last_inspection=today - timedelta(days=60), next_inspection=today - timedelta(days=1),
+        )
+        make_component('REP002', length_mm=3000, weight_kg=12.5, location='Yard A', condition='REPAIR')
+        make_component('REP003', category='Board', length_mm=500, weight_kg=4.0, site='Sasolburg', condition='NEW')
+
+    def test_weight_and_piece_totals(self):
+        report = build_stock_report()
+        by_site = {row['site']: row for row in report['weight_by_site']}
+        self.assertEqual(by_site['Secunda']['pieces'], 2)
+        self.assertEqual(float(by_site['Secunda']['total_weight_kg']), 22.5)
+        self.assertEqual(float(by_site['Sasolburg']['total_weight_kg']), 4.0)
+
+    def test_length_histogram(self):
+        report = build_stock_report()
+        buckets = {(row['category'], row['min_mm']): row['count'] for row in report['length_histogram']}
+        self.assertEqual(buckets, {('Board', 1): 1, ('Tube', 1001): 1, ('Tube', 2501): 1})
+
+    def test_condition_mix_and_overdue_ratio(self):
+        report = build_stock_report(site='Secunda')
+        self.assertEqual(len(report['condition_mix']), 1)
+        mix = report['condition_mix'][0]
+        self.assertEqual(mix['conditions'], {'NEW': 0, 'GOOD': 1, 'REPAIR': 1, 'SCRAP': 0})
+        self.assertEqual(report['inspections'][0]['overdue'], 1)
+        self.assertEqual(report['inspections'][0]['overdue_ratio'], 0.5)
+
+    def test_report_is_cached_and_invalidated_on_save(self):
+        build_stock_report()
+        with self.assertNumQueries(0):
+            build_stock_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            ScaffoldComponent.objects.filter(asset_code='REP003').get().delete()
+        report = build_stock_report()
+        self.assertEqual([row['site'] for row in report['weight_by_site']], ['Secunda'])
+
+    def test_report_view(self):
+        response = self.client.get(reverse('scaffold_component_report'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Yard A')
+        self.assertContains(response, 'Stock Report')
+
+    def test_report_csv(self):
+        response = self.client.get(reverse('scaffold_component_report_csv'), {'site': 'Secunda'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'Site,Location,Category,Pieces,Total Weight (kg)')
+        self.assertEqual(lines[1], 'Secunda,Yard A,Tube,2,22.50')
+
+    def test_report_csv_rejects_unknown_section_and_site(self):
+        response = self.client.get(reverse('scaffold_component_report_csv'), {'section': 'x"; evil'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('scaffold_component_report_csv'), {'site': 'Nowhere'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('scaffold_component_report'), {'site': 'Nowhere'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_broken_cache_does_not_fail_saves_or_reports(self):
+        component = ScaffoldComponent.objects.get(asset_code='REP001')
+        with mock.patch('workorders.reports.cache') as broken:
+            broken.add.side_effect = broken.get.side_effect = broken.incr.side_effect = DatabaseError
+            with self.assertLogs('workorders.reports', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    component.condition = 'SCRAP'
+                    component.save()
+                report = build_stock_report()
+        self.assertEqual(ScaffoldComponent.objects.get(pk=component.pk).condition, 'SCRAP')
+        self.assertEqual(sum(row['pieces'] for row in report['weight_by_site']), 3)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'workorders_test_cache',
+    }})
+    def test_migration_creates_database_cache_table(self):
+        migration = import_module('workorders.migrations.0006_create_cache_table')
+        migration.create_cache_table(None, connection.schema_editor())
+        self.assertIn('workorders_test_cache', connection.introspection.table_names())
+
+
+class LocationHierarchyTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def counts(self, path):
+        return {row['condition']: row['count'] for row in subtree_counts(path)}
+
+    def test_location_path_is_built_from_free_text(self):
+        component = make_component('LOC001', location=' Unit 12 / Bay 3 ')
+        self.assertEqual(component.location_node.path, 'Secunda/Unit 12/Bay 3')
+        self.assertEqual(component.location_node.depth, 2)
+        self.assertEqual(component.location_node.parent.path, 'Secunda/Unit 12')
+        self.assertEqual(make_component('LOC002', location='').location_node.path, 'Secunda')
+
+    def test_subtree_counts_follow_creates_updates_and_deletes(self):
+        first = make_component('LOC001', location='Unit 12/Bay 1')
+        make_component('LOC002', location='Unit 12/Bay 2', condition='REPAIR')
+        make_component('LOC003', location='Unit 14')
+        self.assertEqual(self.counts('Secunda/Unit 12'), {'GOOD': 1, 'NEW': 0, 'REPAIR': 1, 'SCRAP': 0})
+        self.assertEqual(self.counts('Secunda')['GOOD'], 2)
+
+        first.condition = 'SCRAP'
+        first.save()
+        self.assertEqual(self.counts('Secunda/Unit 12')['GOOD'], 0)
+        self.assertEqual(self.counts('Secunda/Unit 12')['SCRAP'], 1)
+
+        first.location = 'Unit 14/Bay 9'
+        first.save()
+        self.assertEqual(self.counts('Secunda/Unit 12')['SCRAP'], 0)
+        self.assertEqual(self.counts('Secunda/Unit 14')['SCRAP'], 1)
+
+        first.delete()
+        self.assertEqual(self.counts('Secunda/Unit 14')['SCRAP'], 0)
+        self.assertEqual(self.counts('Secunda')['SCRAP'], 0)
+
+    def test_build_location_index_links_existing_rows(self):
+        make_component('LOC001', location='Unit 12/Bay 1')
+        make_component('LOC002', location='Unit 12/Bay 2', condition='NEW')
+        ScaffoldComponent.objects.update(location_node=None)
+        LocationCount.objects.update(count=0)
+        self.assertEqual(build_location_index(batch_size=1), 2)
+        self.assertFalse(ScaffoldComponent.objects.filter(location_node__isnull=True).exists())
+        self.assertEqual(self.counts('Secunda/Unit 12'), {'GOOD': 1, 'NEW': 1, 'REPAIR': 0, 'SCRAP': 0})
+        self.assertEqual(build_location_index(), 0)
+
+    def test_list_view_location_filter_matches_subtree(self):
+        make_component('LOC001', location='Unit 12/Bay 1')
+        make_component('LOC002', location='Unit 12')
+        make_component('LOC003', location='Unit 120')
+        response = self.client.get(reverse('scaffold_component_list'), {'location': 'Secunda/Unit 12'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertNotContains(response, 'Tube LOC003')
+        self.assertIn({'condition': 'GOOD', 'count': 2}, response.context['location_counts'])
+
+    def test_location_suggestions_stop_at_first_level(self):
+        make_component('LOC001', location='Unit 12/Bay 1')
+        response = self.client.get(reverse('scaffold_component_list'))
+        self.assertEqual(list(response.context['location_choices']), ['Secunda', 'Secunda/Unit 12'])
+
+    def test_location_filter_is_case_sensitive(self):
+        make_component('LOC001', location='Unit 12/Bay 1')
+        make_component('LOC002', location='unit 12/bay')
+        response = self.client.get(reverse('scaffold_component_list'), {'location': 'Secunda/Unit 12'})
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertContains(response, 'Tube LOC001')
+        self.assertNotContains(response, 'Tube LOC002')
+
+
+class AssetCodeReconciliationTest(TestCase):
+    def test_asset_key_is_normalized_on_save(self):
+        self.assertEqual(make_component('tb-00 12').asset_key, 'TB0012')
+
+    def test_exact_collisions_across_sites_and_formats(self):
+        make_component('TB-0012', site='Secunda')
+        make_component('TB0012', site='Sasolburg')
+        make_component('TB0012', site='Secunda')
+        make_component('CP0001')
+        collisions = find_exact_collisions()
+        self.assertEqual(len(collisions), 1)
+        self.assertEqual(collisions[0]['asset_key'], 'TB0012')
+        self.assertEqual(collisions[0]['count'], 3)
+        self.assertEqual(collisions[0]['sites'], 2)
+
+    def test_exact_collisions_ignore_codes_without_letters_or_digits(self):
+        make_component('---')
+        make_component('#', site='Sasolburg')
+        self.assertEqual(find_exact_collisions(), [])
+
+    def test_near_duplicates_are_one_edit_apart(self):
+        for code in ['TB0012', 'TB0021', 'TB00012', 'TB0013', 'TB5555', 'CP0012', 'TBO012', 'T0012', 'AB1', 'BA1']:
+            make_component(code)
+        pairs = {(p['asset_key'], p['similar_key']) for p in find_near_duplicates()}
+        self.assertEqual(pairs, {
+            ('TB0012', 'TB0021'), ('TB00012', 'TB0012'), ('TB0012', 'TB0013'),
+            ('TB0012', 'TBO012'), ('T0012', 'TB0012'), ('AB1', 'BA1'),
+        })
+
+    def test_reconcile_command(self):
+        make_component('TB-0012', site='Secunda')
+        make_component('TB0012', site='Sasolburg')
+        make_component('TB0013', site='Sasolburg')
+        out = StringIO()
+        call_command('reconcile_asset_codes', stdout=out)
+        self.assertIn('EXACT TB0012', out.getvalue())
+        self.assertIn('NEAR TB0012 ~ TB0013', out.getvalue())
+        self.assertIn('1 exact collision group(s), 1 near-duplicate pair(s).', out.getvalue())
+
+    def test_reconcile_command_refreshes_keys_written_without_save(self):
+        make_component('TB0012', site='Secunda')
+        copy = make_component('CP0001', site='Sasolburg')
+        copy.pk = None
+        copy.asset_code = 'TB-0012'
+        ScaffoldComponent.objects.filter(asset_code='CP0001').delete()
+        ScaffoldComponent.objects.bulk_create([copy])
+        ScaffoldComponent.objects.filter(asset_code='TB0012').update(asset_code='TB0013')
+        out = StringIO()
+        call_command('reconcile_asset_codes', '--batch-size', '1', stdout=out)
+        self.assertIn('Refreshed 2 stale asset key(s).', out.getvalue())
+        self.assertIn('NEAR TB0012 ~ TB0013', out.getvalue())
+        self.assertEqual(
+            set(ScaffoldComponent.objects.values_list('asset_code', 'asset_key')),
+            {('TB-0012', 'TB0012'), ('TB0013', 'TB0013')},
+        )
+
+
+# Generous enough for a cold CI container, tight enough to catch an accidental heavy import
+COLD_START_BUDGET_SECONDS = 5.0
+FIRST_REQUEST_BUDGET_SECONDS = 0.5
+
+COLD_START_SCRIPT = """
+import io, json, time
+start = time.perf_counter()
+from scaffold_manager.wsgi import application
+boot = time.perf_counter() - start
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': '/healthz', 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+}
+status = []
+start = time.perf_counter()
+body = b''.join(application(environ, lambda s, h: status.append(s)))
+first_request = time.perf_counter() - start
+print(json.dumps({'boot': boot, 'first_request': first_request, 'status': status[0]}))
+"""
+
+
+class StartupTest(TestCase):
+    def test_healthz_skips_session_csrf_and_host_checks(self):
+        response = self.client.get('/healthz', HTTP_HOST='10.0.0.4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_healthz_database_check(self):
+        response = self.client.get('/healthz', {'db': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'database': 'ok'})
+
+    def test_healthz_database_failure_does_not_leak_details(self):
+        with mock.patch('scaffold_manager.middleware.connection.cursor',
+                        side_effect=Exception('could not connect to db-host.internal as admin')):
+            with self.assertLogs('scaffold_manager.middleware', level='ERROR'):
+                response = self.client.get('/healthz', {'db': '1'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'error', 'database': 'unavailable'})
+
+    def test_warm_up_compiles_project_templates(self):
+        from scaffold_manager.warmup import _project_template_names, warm_up
+        names = set(_project_template_names())
+        self.assertIn('base.html', names)
+        self.assertIn('workorders/scaffold_component_list.html', names)
+        self.assertFalse(any(name.startswith('admin/') for name in names))
+        self.assertEqual(set(warm_up()), {'urls', 'templates', 'database'})
+
+    def test_cold_start_and_first_request_within_budget(self):
+        result = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(timings['status'], '200 OK')
+        self.assertLess(timings['boot'], COLD_START_BUDGET_SECONDS)
+        self.assertLess(timings['first_request'], FIRST_REQUEST_BUDGET_SECONDS)
+
+
+class OptimisticConcurrencyTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.component = make_component('CONC001', name='Coupler', category='Coupler', weight_kg=1.5, location='Unit 12')
+        self.post_data = {
+            'asset_code': 'CONC001', 'name': 'Coupler', 'category': 'Coupler', 'weight_kg': 1.5,
+            'site': 'Secunda', 'location': 'Unit 12', 'condition': 'GOOD',
+            'last_inspection': self.component.last_inspection,
+            'next_inspection': self.component.next_inspection,
+            'is_in_use': False,
+        }
+
+    def test_edit_view_rejects_missing_version(self):
+        response = self.client.post(reverse('scaffold_component_edit', args=[self.component.pk]),
+                                    dict(self.post_data, name='No Version'))
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, 'missing the version', status_code=400)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.name, 'Coupler')
+
+    def test_save_changes_bumps_version_and_writes_only_changed_fields(self):
+        mine = ScaffoldComponent.objects.get(pk=self.component.pk)
+        ScaffoldComponent.objects.filter(pk=self.component.pk).update(weight_kg=2.0)
+        mine.name = 'Renamed Coupler'
+        mine.save_changes(['name'], expected_version=1)
+        mine.refresh_from_db()
+        self.assertEqual(mine.version, 2)
+        self.assertEqual(mine.name, 'Renamed Coupler')
+        self.assertEqual(float(mine.weight_kg), 2.0)
+
+    def test_save_changes_rejects_stale_version(self):
+        first = ScaffoldComponent.objects.get(pk=self.component.pk)
+        second = ScaffoldComponent.objects.get(pk=self.component.pk)
+        first.name = 'First Edit'
+        first.save_changes(['name'], expected_version=1)
+        second.name = 'Second Edit'
+        with self.assertRaises(ConcurrentEditError):
+            second.save_changes(['name'], expected_version=1)
+        self.assertEqual(ScaffoldComponent.objects.get(pk=self.component.pk).name, 'First Edit')
+
+    def test_failed_count_adjustment_rolls_back_the_save(self):
+        mine = ScaffoldComponent.objects.get(pk=self.component.pk)
+        mine.condition = 'REPAIR'
+        # Stands in for a drifted count hitting the PositiveIntegerField CHECK on decrement
+        with mock.patch('workorders.signals.adjust_subtree_counts', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                mine.save_changes(['condition'], expected_version=1)
+        row = ScaffoldComponent.objects.get(pk=self.component.pk)
+        self.assertEqual((row.condition, row.version), ('GOOD', 1))
+
+    def test_save_changes_keeps_location_counts_current(self):
+        mine = ScaffoldComponent.objects.get(pk=self.component.pk)
+        mine.condition = 'REPAIR'
+        mine.location = 'Unit 14'
+        mine.save_changes(['condition', 'location'], expected_version=1)
+        counts = {(c['location__path'], c['condition']): c['count']
+                  for c in LocationCount.objects.values('location__path', 'condition', 'count')}
+        self.assertEqual(counts[('Secunda/Unit 12', 'GOOD')], 0)
+        self.assertEqual(counts[('Secunda/Unit 14', 'REPAIR')], 1)
+        self.assertEqual(counts[('Secunda', 'REPAIR')], 1)
+
+    def test_failed_plain_save_keeps_numeric_version(self):
+        with mock.patch('workorders.signals.adjust_subtree_counts', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.component.condition = 'REPAIR'
+                self.component.save()
+        self.assertEqual(self.component.version, 1)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.version, 1)
+
+    def test_plain_save_bumps_version(self):
+        self.component.name = 'Saved'
+        self.component.save()
+        self.assertEqual(self.component.version, 2)
+
+    def test_edit_view_returns_conflict_for_stale_version(self):
+        response = self.client.get(reverse('scaffold_component_edit', args=[self.component.pk]))
+        self.assertContains(response, 'name="version" value="1"')
+
+        first = dict(self.post_data, name='First Edit', version=1)
+        response = self.client.post(reverse('scaffold_component_edit', args=[self.component.pk]), first)
+        self.assertEqual(response.status_code, 302)
+
+        second = dict(self.post_data, name='Second Edit', version=1)
+        response = self.client.post(reverse('scaffold_component_edit', args=[self.component.pk]), second)
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'changed by someone else', status_code=409)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.name, 'First Edit')
+        self.assertEqual(self.component.version, 2)
@@ -3,6 +3,8 @@ from . import views
 
 urlpatterns = [
     path('', views.scaffold_component_list, name='scaffold_component_list'),
+    path('report/', views.scaffold_component_report, name='scaffold_component_report'),
+    path('report/csv/', views.scaffold_component_report_csv, name='scaffold_component_report_csv'),
     path('create/', views.scaffold_component_create, name='scaffold_component_create'),
     path('<int:pk>/', views.scaffold_component_detail, name='scaffold_component_detail'),
     path('<int:pk>/edit/', views.scaffold_component_edit, name='scaffold_component_edit'),
@@ -1,21 +1,17 @@
+import csv
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
 from django.db.models import Count
-from .models import ScaffoldComponent
+from .models import ScaffoldComponent, ArchivedScaffoldComponent, Location, ConcurrentEditError
+from .archive import with_archived, merge_counts
+from .locations import subtree_q, subtree_counts
+from .reports import REPORT_SECTIONS, build_stock_report, report_csv_rows
 from .forms import ScaffoldComponentForm
 from django.urls import reverse_lazy
 
-# List View
-def scaffold_component_list(request):
-    components = ScaffoldComponent.objects.all()
-
-    # Filters
-    q = request.GET.get('q')
-    site_filter = request.GET.get('site')
-    category_filter = request.GET.get('category')
-    condition_filter = request.GET.get('condition')
-    in_use_filter = request.GET.get('in_use')
-
+def _filter_components(components, q, site_filter, category_filter, condition_filter, in_use_filter,
+                       location_filter):
     if q:
         components = components.filter(name__icontains=q) | components.filter(asset_code__icontains=q)
     if site_filter:
@@ -26,11 +22,41 @@ def scaffold_component_list(request):
         components = components.filter(condition=condition_filter)
     if in_use_filter:
         components = components.filter(is_in_use=(in_use_filter == 'true'))
+    if location_filter:
+        components = components.filter(subtree_q(location_filter))
+    return components
+
+# List View
+def scaffold_component_list(request):
+    # Filters
+    q = request.GET.get('q')
+    site_filter = request.GET.get('site')
+    category_filter = request.GET.get('category')
+    condition_filter = request.GET.get('condition')
+    in_use_filter = request.GET.get('in_use')
+    location_filter = (request.GET.get('location') or '').strip().strip('/')
+    include_archived = request.GET.get('include_archived') == '1'
+
+    filters = (q, site_filter, category_filter, condition_filter, in_use_filter, location_filter)
+    components = _filter_components(ScaffoldComponent.objects.all(), *filters)
 
     # Summary Counts
     site_counts = components.values('site').annotate(count=Count('site')).order_by('site')
     condition_counts = components.values('condition').annotate(count=Count('condition')).order_by('condition')
 
+    # Archived SCRAP rows live in their own table and are only read when asked for
+    if include_archived:
+        archived = _filter_components(ArchivedScaffoldComponent.objects.all(), *filters)
+        site_counts = merge_counts(
+            site_counts, archived.values('site').annotate(count=Count('site')).order_by('site'), key='site',
+        )
+        condition_counts = merge_counts(
+            condition_counts,
+            archived.values('condition').annotate(count=Count('condition')).order_by('condition'),
+            key='condition',
+        )
+        components = with_archived(components, archived)
+
     # Pagination
     paginator = Paginator(components, 10) # 10 components per page
     page_number = request.GET.get('page')
@@ -46,6 +72,12 @@ def scaffold_component_list(request):
         'category_filter': category_filter,
         'condition_filter': condition_filter,
         'in_use_filter': in_use_filter,
+        'location_filter': location_filter,
+        # Only sites and their first level are suggested; deeper paths are typed in
+        'location_choices': Location.objects.filter(depth__lte=1).values_list('path', flat=True),
+        # Maintained incrementally, so this stays a single indexed lookup however big the yard is
+        'location_counts': subtree_counts(location_filter) if location_filter else None,
+        'include_archived': include_archived,
         'site_counts': site_counts,
         'condition_counts': condition_counts,
     }
@@ -73,8 +105,18 @@ def scaffold_component_edit(request, pk):
     if request.method == 'POST':
         form = ScaffoldComponentForm(request.POST, instance=component)
         if form.is_valid():
-            form.save()
+            try:
+                form.save_with_version()
+            except ConcurrentEditError:
+                form.add_error(None, 'This component was changed by someone else while you were editing it. '
+                                     'Reload the page to see their changes, then apply yours again.')
+                return render(request, 'workorders/scaffold_component_form.html',
+                              {'form': form, 'form_type': 'edit'}, status=409)
             return redirect('scaffold_component_list')
+        # A POST without the version can't be checked for conflicts, so it is rejected outright
+        status = 400 if form.has_error('version', 'required') else 200
+        return render(request, 'workorders/scaffold_component_form.html',
+                      {'form': form, 'form_type': 'edit'}, status=status)
     else:
         form = ScaffoldComponentForm(instance=component)
     return render(request, 'workorders/scaffold_component_form.html', {'form': form, 'form_type': 'edit'})
@@ -85,4 +127,36 @@ def scaffold_component_delete(request, pk):
     if request.method == 'POST':
         component.delete()
         return redirect('scaffold_component_list')
-    return render(request, 'workorders/scaffold_component_confirm_delete.html', {'component': component})
\ No newline at end of file
+    return render(request, 'workorders/scaffold_component_confirm_delete.html', {'component': component})
+
+def _report_site(request):
+    # The site is part of the report cache key, so only known sites get through
+    site_filter = request.GET.get('site') or None
+    if site_filter is not None and site_filter not in dict(ScaffoldComponent.SITE_CHOICES):
+        raise Http404('Unknown site.')
+    return site_filter
+
+# Stock Report View
+def scaffold_component_report(request):
+    site_filter = _report_site(request)
+    report = build_stock_report(site=site_filter)
+    context = {
+        'report': report,
+        'site_choices': ScaffoldComponent.SITE_CHOICES,
+        'condition_choices': ScaffoldComponent.CONDITION_CHOICES,
+        'site_filter': site_filter,
+    }
+    return render(request, 'workorders/scaffold_component_report.html', context)
+
+# Stock Report CSV Export
+def scaffold_component_report_csv(request):
+    site_filter = _report_site(request)
+    section = request.GET.get('section', 'stock')
+    if section not in REPORT_SECTIONS:
+        raise Http404('Unknown report section.')
+    report = build_stock_report(site=site_filter)
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="stock_report_{section}.csv"'
+    writer = csv.writer(response)
+    writer.writerows(report_csv_rows(report, section))
+    return response